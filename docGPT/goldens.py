@@ -0,0 +1,23 @@
+"""
+Shared helpers for turning goldens into DeepEval test cases
+
+The golden evaluation scripts keep their goldens column-wise (one list per
+field, aligned by position), so the inputs can be handed to doc_gpt_batch in
+one go and the test cases built by mapping over the columns:
+
+    test_cases = list(map(make_test_case, inputs, outputs, expected, ids))
+
+Requirements:
+- deepeval
+"""
+
+from deepeval.test_case import LLMTestCase
+
+# LLMTestCase is keyword-only, so a small helper lets us map over the columns.
+def make_test_case(query, actual_output, expected_output, golden_id):
+    return LLMTestCase(
+        input=query,
+        actual_output=actual_output,
+        expected_output=expected_output,
+        metadata={"golden_id": golden_id}
+    )
@@ -0,0 +1,604 @@
+"""
+Shared RAG pipeline for the docGPT evaluation scripts
+
+The evaluation scripts in this folder all test the same retrieval-augmented
+"doc_gpt" over docs/knowledge.txt, so the pipeline lives here once and is
+imported by each of them:
+
+    from rag import doc_gpt, doc_gpt_batch
+
+Nothing is loaded at import time. The document, its chunks, their embeddings
+and the retrieval indexes are built on first use and kept as module-level
+singletons (functools.cache). Chunks and embeddings are also persisted under
+cache/, keyed on the document's mtime and size, so a second run skips both
+chunking and encoding.
+
+Requirements:
+- sentence-transformers
+- numpy
+- rank-bm25
+- faiss-cpu or faiss-gpu (optional, preferred vector index when installed)
+- hnswlib (optional, used once the knowledge base reaches 1000 chunks)
+- numba (optional, JIT-compiled exact scan from 10,000 chunks)
+- a cross-encoder checkpoint (optional, set the RERANKER_MODEL_NAME
+  environment variable to enable)
+"""
+
+import os
+import re
+import json
+import mmap
+import atexit
+import hashlib
+import inspect
+import pickle
+import functools
+import importlib.util
+import itertools
+import collections
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DOCUMENT_PATH = os.path.join(_HERE, "docs", "knowledge.txt")
+CACHE_DIR = os.path.join(_HERE, "cache")
+
+# ----------------------
+# Load document
+# ----------------------
+# The file is memory-mapped rather than read into a string: the pages are
+# streamed straight through sentence splitting, chunking and encoding in one
+# pass, so the full text is never copied into Python objects.
+def load_document(file_path=DOCUMENT_PATH):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Document not found: {file_path}")
+    if os.path.getsize(file_path) == 0:
+        return b""  # mmap cannot map an empty file
+    with open(file_path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+@functools.cache
+def _document():
+    document = load_document()
+    print("Loaded document")
+    return document
+
+# ----------------------
+# Embedding model
+# ----------------------
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# The model (and the torch import behind it) is loaded on first use, so paths
+# that never encode anything, such as a missing document, skip that cost.
+@functools.cache
+def _model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+# ----------------------
+# Split document into chunks for retrieval
+# ----------------------
+# This breaks the document into smaller pieces that can be individually
+# retrieved and compared against queries.
+# Sentences are packed by token count using the embedding model's own
+# tokenizer, so chunk boundaries match what the model sees. A sentence longer
+# than a whole chunk is cut on token boundaries, so no chunk runs past the
+# model's max_seq_length (256 tokens for MiniLM) and gets silently truncated.
+# Both steps are generators, so chunks are produced as the file is scanned.
+CHUNK_TOKENS = 32
+TOKENIZE_BATCH = 256
+
+def iter_sentences(data):
+    # A "." byte never occurs inside a multi-byte UTF-8 sequence, so splitting
+    # the raw bytes before decoding is safe.
+    for match in re.finditer(rb"[^.]*\.|[^.]+$", data):
+        if not match.group().isspace():
+            yield match.group().decode("utf-8")
+
+def split_into_chunks(sentences, chunk_tokens=CHUNK_TOKENS):
+    model = _model()
+    chunk_tokens = min(chunk_tokens, model.max_seq_length - 2)  # room for [CLS]/[SEP]
+    sentences = iter(sentences)
+    parts = []
+    size = 0
+    while batch := list(itertools.islice(sentences, TOKENIZE_BATCH)):
+        encoded = model.tokenizer(batch, add_special_tokens=False, return_offsets_mapping=True)
+        for sentence, ids, offsets in zip(batch, encoded["input_ids"], encoded["offset_mapping"]):
+            if parts and size + len(ids) > chunk_tokens:
+                yield "".join(parts).strip()
+                parts.clear()
+                size = 0
+            # Full chunk_tokens pieces of an over-long sentence are chunks of
+            # their own; the remainder is packed with the sentences after it.
+            cut, cut_token = 0, 0
+            for start in range(chunk_tokens, len(ids), chunk_tokens):
+                yield sentence[cut:offsets[start][0]].strip()
+                cut, cut_token = offsets[start][0], start
+            parts.append(sentence[cut:])
+            size += len(ids) - cut_token
+    if parts:
+        yield "".join(parts).strip()
+
+# ----------------------
+# Create embeddings for semantic search
+# ----------------------
+# Convert text chunks into numerical vectors that capture semantic meaning.
+# These embeddings allow us to find similar content using cosine similarity.
+# Chunks and their embeddings only change with the document, so they are
+# saved once (embeddings as FP16) and loaded on later runs, the embeddings
+# memory-mapped, instead of being re-chunked and re-encoded.
+ENCODE_BATCH = 64
+
+def corpus_key(file_path=DOCUMENT_PATH):
+    # Keyed on the document's mtime and size rather than its contents, so a
+    # warm run only needs a stat() call to find its cached artifacts. The
+    # chunker's source is part of the key, so changing how the document is
+    # split rebuilds the chunks.
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Document not found: {file_path}")
+    stat = os.stat(file_path)
+    chunker = inspect.getsource(iter_sentences) + inspect.getsource(split_into_chunks)
+    key = "\0".join([
+        EMBEDDING_MODEL_NAME, str(CHUNK_TOKENS), chunker, os.path.abspath(file_path),
+        str(stat.st_mtime_ns), str(stat.st_size),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def build_corpus(chunks_path, embeddings_path):
+    # Chunks are encoded as they stream out of the chunker, ENCODE_BATCH at a
+    # time, so peak memory is one batch of text rather than the whole document.
+    model = _model()
+    chunk_stream = split_into_chunks(iter_sentences(_document()))
+    chunks = []
+    batches = []
+    while batch := list(itertools.islice(chunk_stream, ENCODE_BATCH)):
+        chunks.extend(batch)
+        # Normalize once up front so cosine similarity reduces to a dot product.
+        embs = model.encode(
+            batch, batch_size=ENCODE_BATCH, normalize_embeddings=True, show_progress_bar=False
+        )
+        batches.append(embs.astype(np.float16))
+    dim = model.get_sentence_embedding_dimension()
+    embs = np.concatenate(batches) if batches else np.empty((0, dim), dtype=np.float16)
+    # Both files are written to temp paths and swapped in with os.replace,
+    # embeddings first and chunks last, so a run started alongside this one
+    # never loads a half-written file.
+    os.makedirs(os.path.dirname(chunks_path), exist_ok=True)
+    tmp_path = f"{embeddings_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, embs)
+    os.replace(tmp_path, embeddings_path)
+    tmp_path = f"{chunks_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(chunks, f)
+    os.replace(tmp_path, chunks_path)
+
+def load_corpus(chunks_path, embeddings_path):
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    embs = np.load(embeddings_path, mmap_mode="r")
+    if len(embs) != len(chunks):
+        raise ValueError(f"{embeddings_path} does not match {chunks_path}")
+    return chunks, embs
+
+@functools.cache
+def _corpus():
+    key = corpus_key()
+    chunks_path = os.path.join(CACHE_DIR, f"chunks.{key}.json")
+    embeddings_path = os.path.join(CACHE_DIR, f"chunk_embeddings.{key}.f16.npy")
+    if os.path.exists(chunks_path) and os.path.exists(embeddings_path):
+        try:
+            return load_corpus(chunks_path, embeddings_path)
+        except (OSError, ValueError):
+            pass  # truncated or corrupt cache files are rebuilt
+    build_corpus(chunks_path, embeddings_path)
+    return load_corpus(chunks_path, embeddings_path)
+
+def _chunks():
+    return _corpus()[0]
+
+def _chunk_embeddings():
+    return _corpus()[1]
+
+# Exact scores for small corpora (see dense_rankings). NumPy has no FP16 BLAS
+# kernel, so the FP16 embeddings are widened to FP32 for the product.
+def dense_scores(query_embs):
+    return query_embs @ _chunk_embeddings().astype(np.float32).T
+
+# ----------------------
+# Vector index
+# ----------------------
+# Large knowledge bases get an HNSW graph index so retrieval is sub-linear.
+# Below HNSW_MIN_CHUNKS a brute-force scan is faster than walking the graph.
+# FAISS is preferred when installed: its flat index uses SIMD kernels, and
+# runs on the GPU when one is available (brute force on a GPU beats HNSW).
+# Both libraries are imported on first retrieval rather than with this module
+# (faiss-gpu also initializes CUDA), and hnswlib only for a large corpus.
+HNSW_MIN_CHUNKS = 1000
+_faiss_gpu_resources = None
+
+@functools.cache
+def _faiss():
+    # The faiss module (faiss-cpu or faiss-gpu), or None when not installed
+    try:
+        import faiss
+    except ImportError:
+        return None
+    return faiss
+
+@functools.cache
+def _hnswlib():
+    # The hnswlib module, or None when not installed
+    try:
+        import hnswlib
+    except ImportError:
+        return None
+    return hnswlib
+
+def build_faiss_index(embs):
+    global _faiss_gpu_resources
+    faiss = _faiss()
+    embs = np.ascontiguousarray(embs, dtype=np.float32)
+    dim = embs.shape[1]
+    if faiss.get_num_gpus() > 0:
+        _faiss_gpu_resources = faiss.StandardGpuResources()
+        index = faiss.index_cpu_to_gpu(_faiss_gpu_resources, 0, faiss.IndexFlatIP(dim))
+    elif len(embs) >= HNSW_MIN_CHUNKS:
+        index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 128
+        index.hnsw.efSearch = 64
+    else:
+        index = faiss.IndexFlatIP(dim)
+    index.add(embs)
+    return index
+
+def build_hnsw_index(embs):
+    index = _hnswlib().Index(space="ip", dim=embs.shape[1])
+    index.init_index(max_elements=len(embs), M=32, ef_construction=128)
+    index.add_items(np.asarray(embs, dtype=np.float32), np.arange(len(embs)))
+    index.set_ef(64)
+    return index
+
+@functools.cache
+def _vector_index():
+    # (backend, index) for the active vector index, or None for brute force
+    embs = _chunk_embeddings()
+    if _faiss() is not None:
+        return "faiss", build_faiss_index(embs)
+    if len(embs) >= HNSW_MIN_CHUNKS and _hnswlib() is not None:
+        return "hnsw", build_hnsw_index(embs)
+    return None
+
+def index_search(query_embs, k=1):
+    # Top-k chunk ids per query from the vector index, or None without one
+    vector_index = _vector_index()
+    if vector_index is None:
+        return None
+    backend, index = vector_index
+    if backend == "faiss":
+        _, labels = index.search(query_embs, k)
+        return labels
+    labels, _ = index.knn_query(query_embs, k=k)
+    return labels
+
+# Binary-quantized copy of the embeddings: one bit per dimension, 32x smaller
+# than FP32. Without a vector index, from BINARY_MIN_CHUNKS up retrieval is
+# two-stage: the Hamming distance over these bits shortlists
+# RESCORE_CANDIDATES chunks, and only those are rescored exactly with FP32 dot
+# products. The first stage reads N*d/8 bytes instead of N*d*4; the float work
+# is limited to the shortlist. The shortlist is lossy, so smaller corpora,
+# where an exact scan is cheap anyway, keep the exact scan.
+BINARY_MIN_CHUNKS = HNSW_MIN_CHUNKS
+RESCORE_CANDIDATES = 20
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+@functools.cache
+def _binary_codes():
+    return np.packbits(_chunk_embeddings() > 0, axis=1)
+
+def hamming_distances(query_bin):
+    xor = np.bitwise_xor(_binary_codes(), query_bin)
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0, compiles to POPCNT
+        return np.bitwise_count(xor).sum(axis=1, dtype=np.uint32)
+    return POPCOUNT[xor].sum(axis=1, dtype=np.uint32)
+
+def binary_shortlist(query_emb):
+    distances = hamming_distances(np.packbits(query_emb > 0))
+    return np.argpartition(distances, RESCORE_CANDIDATES)[:RESCORE_CANDIDATES]
+
+# Above NUMBA_MIN_CHUNKS, with numba installed and no vector index, the exact
+# scan is JIT-compiled instead: dot products and top-k selection are fused in
+# one parallel pass, so no full score array is materialized. Each block of
+# SCAN_BLOCK rows keeps its own top-k; the per-block winners are merged after.
+# numba is only imported once a corpus that large is seen, so small
+# knowledge bases don't pay for the import.
+NUMBA_MIN_CHUNKS = 10_000
+SCAN_BLOCK = 4096
+
+@functools.cache
+def _fused_topk():
+    # The JIT-compiled kernel, or None without numba
+    try:
+        import numba
+    except ImportError:
+        return None
+
+    # fastmath without nnan/ninf: the per-block top-k starts at -inf, and
+    # comparisons against it are undefined under LLVM's no-infinities flag.
+    @numba.njit(parallel=True, fastmath={"reassoc", "contract", "arcp", "nsz", "afn"}, cache=True)
+    def fused_topk(emb, q, k):
+        n, d = emb.shape
+        n_blocks = (n + SCAN_BLOCK - 1) // SCAN_BLOCK
+        top_scores = np.full((n_blocks, k), -np.inf, dtype=np.float32)
+        top_ids = np.full((n_blocks, k), -1, dtype=np.int64)
+        for b in numba.prange(n_blocks):
+            for i in range(b * SCAN_BLOCK, min(n, (b + 1) * SCAN_BLOCK)):
+                s = np.float32(0.0)
+                for j in range(d):
+                    s += emb[i, j] * q[j]
+                if s > top_scores[b, k - 1]:
+                    pos = k - 1
+                    while pos > 0 and top_scores[b, pos - 1] < s:
+                        top_scores[b, pos] = top_scores[b, pos - 1]
+                        top_ids[b, pos] = top_ids[b, pos - 1]
+                        pos -= 1
+                    top_scores[b, pos] = s
+                    top_ids[b, pos] = i
+        return top_scores.ravel(), top_ids.ravel()
+
+    return fused_topk
+
+@functools.cache
+def _chunk_embeddings_f32():
+    # numba kernels work on FP32, so the FP16 cache is widened once here
+    return np.ascontiguousarray(_chunk_embeddings(), dtype=np.float32)
+
+def fused_ranking(query_emb, k):
+    scores, ids = _fused_topk()(_chunk_embeddings_f32(), query_emb, k)
+    ids = ids[np.argsort(-scores)[:k]]
+    return ids[ids >= 0]
+
+# ----------------------
+# Query encoding
+# ----------------------
+# Query embeddings are cached by the SHA-256 of the query text, so repeated
+# queries skip the transformer forward pass. Misses are encoded in one batch.
+# The cache is an LRU capped at QUERY_CACHE_SIZE entries.
+QUERY_CACHE_SIZE = 1024
+_query_emb_cache = collections.OrderedDict()
+
+def encode_queries(queries):
+    keys = [hashlib.sha256(query.encode("utf-8")).hexdigest() for query in queries]
+    embs = {key: _query_emb_cache[key] for key in keys if key in _query_emb_cache}
+    missing = {key: query for key, query in zip(keys, queries) if key not in embs}
+    if missing:
+        encoded = _model().encode(
+            list(missing.values()), normalize_embeddings=True, batch_size=32, convert_to_numpy=True
+        ).astype(np.float32)
+        embs.update(zip(missing, encoded))
+    for key, emb in embs.items():
+        _query_emb_cache[key] = emb
+        _query_emb_cache.move_to_end(key)
+    while len(_query_emb_cache) > QUERY_CACHE_SIZE:
+        _query_emb_cache.popitem(last=False)
+    return np.stack([embs[key] for key in keys])
+
+# ----------------------
+# Hybrid ranking
+# ----------------------
+# A dense ranking and a BM25 keyword ranking are merged with reciprocal rank
+# fusion (RRF). Exact term matches ("Eiffel Tower") are often the strongest
+# signal for factoid queries, and BM25 over the chunks costs next to nothing
+# at this scale.
+FUSION_DEPTH = 20  # candidates taken from each ranking
+RRF_K = 60
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+@functools.cache
+def _bm25():
+    # None for a document with no words: BM25Okapi divides by the corpus size
+    # and average chunk length, so it cannot be built over an empty corpus.
+    corpus = [tokenize(chunk) for chunk in _chunks()]
+    return BM25Okapi(corpus) if any(corpus) else None
+
+def dense_rankings(query_embs, k=FUSION_DEPTH):
+    # Chunk ids for each query, best first
+    n_chunks = len(_chunks())
+    k = min(k, n_chunks)
+    if k == 0:
+        return [np.empty(0, dtype=np.int64) for _ in query_embs]
+    labels = index_search(query_embs, k)
+    if labels is not None:
+        return [row[row >= 0] for row in labels]
+    if n_chunks >= NUMBA_MIN_CHUNKS and _fused_topk() is not None:
+        return [fused_ranking(query_emb, k) for query_emb in query_embs]
+    if n_chunks >= BINARY_MIN_CHUNKS:
+        chunk_embeddings = _chunk_embeddings()
+        rankings = []
+        for query_emb in query_embs:
+            candidates = binary_shortlist(query_emb)
+            scores = chunk_embeddings[candidates].astype(np.float32) @ query_emb
+            rankings.append(candidates[np.argsort(-scores)[:k]])
+        return rankings
+    scores = dense_scores(query_embs)  # shape: [n_queries, n_chunks]
+    return list(np.argsort(-scores, axis=1)[:, :k])
+
+def bm25_ranking(query, k=FUSION_DEPTH):
+    bm25 = _bm25()
+    if bm25 is None:
+        return np.empty(0, dtype=np.int64)
+    scores = bm25.get_scores(tokenize(query))
+    top = np.argsort(-scores)[:k]
+    return top[scores[top] > 0]
+
+def reciprocal_rank_fusion(*rankings):
+    # Chunk ids ordered by fused score, best first
+    scores = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking):
+            scores[int(idx)] = scores.get(int(idx), 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+# ----------------------
+# Optional cross-encoder rerank
+# ----------------------
+# A cross-encoder reads the query and a chunk together, which is more precise
+# than comparing two independent embeddings but far too slow to run over the
+# whole corpus. It is only applied to the top RERANK_CANDIDATES fused results.
+# Disabled unless the RERANKER_MODEL_NAME environment variable names a
+# checkpoint, e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2".
+RERANKER_MODEL_NAME = os.environ.get("RERANKER_MODEL_NAME") or None
+RERANK_CANDIDATES = 20
+
+@functools.cache
+def _reranker():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANKER_MODEL_NAME)
+
+def rerank(query, ids):
+    if RERANKER_MODEL_NAME is None or len(ids) < 2:
+        return ids
+    chunks = _chunks()
+    scores = _reranker().predict([(query, chunks[i]) for i in ids])
+    return [ids[i] for i in np.argsort(-scores, kind="stable")]
+
+def top_k_ids(query, dense_ranking, k):
+    fused = reciprocal_rank_fusion(dense_ranking, bm25_ranking(query))
+    return rerank(query, fused[:RERANK_CANDIDATES])[:k]
+
+# ----------------------
+# Retrieve most relevant chunk based on query
+# ----------------------
+# This is the "retrieval" part of RAG - find the most relevant document chunks
+# for a given query, fusing embedding similarity with BM25 keyword scores.
+def retrieve_top_k(query, k):
+    chunks = _chunks()
+    query_emb = encode_queries([query])[0]
+    dense = dense_rankings(query_emb.reshape(1, -1))[0]
+    return [chunks[i] for i in top_k_ids(query, dense, k)]
+
+def retrieve_context(query):
+    # An empty document has no chunks, so the context is empty as well
+    best_chunk = retrieve_top_k(query, k=1)
+    return best_chunk[0] if best_chunk else ""
+
+# Batched variant: encode every query in one forward pass and rank them all
+# against the chunks with a single matrix product.
+def retrieve_contexts(queries):
+    chunks = _chunks()
+    query_embs = encode_queries(queries)
+    dense = dense_rankings(query_embs)
+    contexts = []
+    for query, ranking in zip(queries, dense):
+        best = top_k_ids(query, ranking, 1)
+        contexts.append(chunks[best[0]] if best else "")
+    return contexts
+
+# ----------------------
+# Semantic cache over final answers
+# ----------------------
+# Paraphrases of a question land close together in embedding space, so an
+# answer is reused when a cached query scores >= SEMANTIC_CACHE_THRESHOLD.
+# The cache is saved to disk on exit and tied to the pipeline it was built
+# with, so a warm run never serves answers from a different retrieval setup.
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, "answer_cache.pkl")
+
+def pipeline_key():
+    # The corpus plus everything that decides what is answered: this module's
+    # source (so any code change invalidates the cache), the installed vector
+    # backends and the ranking constants. Which retrieval path runs follows
+    # from these and the chunk count.
+    with open(__file__, "rb") as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    key = "\0".join([
+        corpus_key(), source_hash, str(RERANKER_MODEL_NAME), str(RERANK_CANDIDATES),
+        str(RRF_K), str(FUSION_DEPTH), str(RESCORE_CANDIDATES),
+        str(HNSW_MIN_CHUNKS), str(BINARY_MIN_CHUNKS), str(NUMBA_MIN_CHUNKS),
+        *(str(importlib.util.find_spec(name) is not None) for name in ("faiss", "hnswlib", "numba")),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+def read_answer_cache(key, path=SEMANTIC_CACHE_PATH):
+    # (embs, answers) saved under key, or (None, []) if there are none. A
+    # missing, truncated or old-format file is treated as a miss.
+    try:
+        with open(path, "rb") as f:
+            cached_key, embs, answers = pickle.load(f)
+    except Exception:
+        return None, []
+    if cached_key == key:
+        return embs, answers
+    return None, []
+
+def save_answer_cache(cache, key, path=SEMANTIC_CACHE_PATH):
+    # Entries saved by another run since this one loaded the cache are kept,
+    # and the file is swapped in with os.replace so readers never see a
+    # partial write.
+    new = slice(cache["loaded"], None)
+    if not cache["answers"][new]:
+        return
+    embs, answers = read_answer_cache(key, path)
+    if answers:
+        embs = np.vstack([embs, cache["embs"][new]])
+        answers = answers + cache["answers"][new]
+    else:
+        embs, answers = cache["embs"], cache["answers"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((key, embs, answers), f)
+    os.replace(tmp_path, path)
+
+@functools.cache
+def _answer_cache(path=SEMANTIC_CACHE_PATH):
+    key = pipeline_key()
+    embs, answers = read_answer_cache(key, path)
+    cache = {"embs": embs, "answers": answers, "loaded": len(answers)}
+    atexit.register(save_answer_cache, cache, key, path)
+    return cache
+
+def lookup_answer(query_emb):
+    cache = _answer_cache()
+    if not cache["answers"]:
+        return None
+    sims = cache["embs"] @ query_emb
+    best = int(np.argmax(sims))
+    return cache["answers"][best] if sims[best] >= SEMANTIC_CACHE_THRESHOLD else None
+
+def store_answer(query_emb, answer):
+    cache = _answer_cache()
+    if cache["answers"]:
+        cache["embs"] = np.vstack([cache["embs"], query_emb])
+    else:
+        cache["embs"] = query_emb[None, :]
+    cache["answers"].append(answer)
+
+# ----------------------
+# RAG function: retrieves context and generates response
+# ----------------------
+# This simulates a RAG system that:
+# 1. Takes a user query
+# 2. Retrieves relevant context from the knowledge base
+# 3. Generates a response based on that context
+def doc_gpt(query):
+    query_emb = encode_queries([query])[0]
+    answer = lookup_answer(query_emb)
+    if answer is None:
+        context = retrieve_context(query)
+        answer = f"Based on the document: {context}"
+        store_answer(query_emb, answer)
+    return answer
+
+def doc_gpt_batch(queries):
+    query_embs = encode_queries(queries)
+    answers = [lookup_answer(query_emb) for query_emb in query_embs]
+    misses = [i for i, answer in enumerate(answers) if answer is None]
+    if misses:
+        contexts = retrieve_contexts([queries[i] for i in misses])
+        for i, context in zip(misses, contexts):
+            answers[i] = f"Based on the document: {context}"
+            store_answer(query_embs[i], answers[i])
+    return answers
@@ -3,6 +3,7 @@ from deepeval.metrics import TaskCompletionMetric, ArgumentCorrectnessMetric
 from deepeval.test_case import LLMTestCase, ToolCall
 from deepeval import evaluate
 import os
+import re
 import random
 
 # --- Load knowledge base ---
@@ -14,22 +15,37 @@ def load_knowledge(file_path="docs/knowledge.txt"):
 
 knowledge_base = load_knowledge()
 
+# --- Index the knowledge base once: lowercased city -> weather ---
+# Lines look like "The weather in Jakarta is Sunny."
+def build_city_index(text):
+    index = {}
+    for line in text.split("\n"):
+        head, sep, weather = line.rpartition(" is ")
+        if sep:
+            city = head.split(" in ", 1)[-1]
+            index[city.strip().lower()] = weather.strip().rstrip(".")
+    return index
+
+city_index = build_city_index(knowledge_base)
+wrong_pool = list(city_index.items())
+
 # --- Define tools (external functionalities) ---  
 def fetch_weather(city: str) -> str:
     """Fetch weather from knowledge base with possible noise."""
-    lines = knowledge_base.split("\n")
+    key = city.lower()
     
     # 20% chance of returning the wrong city to simulate imperfection
-    if random.random() < 0.2:
-        # Pick a random line (wrong city)
-        wrong_line = random.choice([l for l in lines if l.strip() and city.lower() not in l.lower()])
-        return wrong_line.split("is")[-1].strip() + f" in {city}!"
+    if random.random() < 0.2 and len(wrong_pool) > 1:
+        # Pick a random entry (wrong city)
+        wrong_city, wrong_weather = random.choice(wrong_pool)
+        while wrong_city == key:
+            wrong_city, wrong_weather = random.choice(wrong_pool)
+        return f"{wrong_weather} in {city}!"
     
-    # 80% correct - search for the city in knowledge base
-    for line in lines:
-        if city.lower() in line.lower():
-            weather = line.split("is")[-1].strip().rstrip(".")
-            return f"{weather} in {city}!"
+    # 80% correct - look the city up in the index
+    weather = city_index.get(key)
+    if weather is not None:
+        return f"{weather} in {city}!"
     
     # Fallback if city not found
     return f"No weather data available for {city}."
@@ -42,6 +58,13 @@ def call_weather_tool(city: str) -> str:
     return result
 
 # --- Define the agent (or conversational system) ---  
+# Compiled once: matches any weather question, and captures the city from
+# "... weather ... in <City>[, <Region>]?" when one is given
+weather_pattern = re.compile(
+    r"\bweather\b(?:.*\bin\s+(?P<city>[^\W\d_][\w .'-]*?)(?:,[^?.!]*)?\s*[?.!]*\s*$)?",
+    re.IGNORECASE,
+)
+
 @observe()
 def weather_agent(user_input: str) -> str:
     # 30% chance of misunderstanding user input
@@ -50,11 +73,15 @@ def weather_agent(user_input: str) -> str:
         return output
 
     # Simple parsing example
-    if "weather" in user_input.lower():
-        city = user_input.split("in")[-1].strip().rstrip("?")
+    match = weather_pattern.search(user_input)
+    if match and match.group("city"):
+        city = match.group("city")
         weather_str = call_weather_tool(city)
         output = f"The weather today: {weather_str}"
         return output
+    elif match:
+        output = "Which city would you like the weather for?"
+        return output
     else:
         output = "I can only help with weather inquiries."
         return output
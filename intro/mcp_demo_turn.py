@@ -2,9 +2,11 @@ from deepeval.test_case import LLMTestCase, MCPServer, MCPToolCall
 from deepeval.metrics import MCPUseMetric
 from deepeval import evaluate
 from mcp.types import CallToolResult
+from functools import lru_cache
 
 
-# Simulated MCP server and tool
+# Simulated MCP server and tool (pure, so results are cached per operand pair)
+@lru_cache(maxsize=None)
 def math_server_add(a, b):
     """Simulated external math tool (MCP Server)."""
     return a + b
@@ -19,6 +21,9 @@ conversation = [
     {"role": "assistant", "content": "The answer is 8! Would you like to add more numbers?"},
 ]
 
+# Flatten the conversation into the test case input once, up front
+conversation_text = "\n".join(turn["content"] for turn in conversation)
+
 # Define expected behavior
 expected_final_output = "The answer is 8"
 expected_tool_name = "math_server_add"
@@ -40,7 +45,7 @@ math_server = MCPServer(server_name="math_server")
 
 # Create the test case
 test_case = LLMTestCase(
-    input="\n".join([turn["content"] for turn in conversation]),
+    input=conversation_text,
     expected_output=expected_final_output,
     actual_output=actual_output,
     mcp_tools_called=[tool_call],